@@ -5,75 +5,246 @@ Unified Photo Search - Searches both JPG and RAW photo databases
 
 import sqlite3
 import argparse
+import json
 import os
+import tempfile
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
 
 JPG_DB = r"x:\openclaw\workspace\photos_full.db"
 RAW_DB = r"x:\openclaw\workspace\raw_photos.db"
 
+# Local endpoint for --serve (named pipe on Windows, per-user Unix socket elsewhere)
+if os.name == 'nt':
+    SERVER_ADDRESS = r'\\.\pipe\openclaw-photo-search'
+else:
+    SERVER_ADDRESS = os.path.join(tempfile.gettempdir(), f'openclaw-photo-search-{os.getuid()}.sock')
 
-def search_all_photos(client=None, date=None, camera=None, location=False, limit=50):
+# DB_PRAGMAS, FTS_MIN_TERM, _readonly_uri and _fts_phrase are copies of the ones in
+# raw_preview_generator.py (both scripts run standalone) - keep them in sync
+
+# Applied to every connection (journal_mode=WAL is set by the writer and persists in the file)
+DB_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;
+    PRAGMA busy_timeout=30000;
+"""
+
+FTS_MIN_TERM = 3  # Trigram MATCH needs at least 3 characters; shorter terms use LIKE
+
+
+def _readonly_uri(path):
+    """SQLite URI opening path read-only with a shared page cache"""
+    # absolute(), not resolve(): resolve() turns mapped drives like X: into UNC paths
+    return Path(path).absolute().as_uri() + '?mode=ro&cache=shared'
+
+
+def _open_db(path):
+    """Open a read-only SQLite connection with tuned PRAGMAs and a shared page cache"""
+    conn = sqlite3.connect(_readonly_uri(path), timeout=30.0, isolation_level=None, uri=True)
+    conn.executescript(DB_PRAGMAS)
+    return conn
+
+
+def _fts_phrase(column, text):
+    """FTS5 MATCH expression for a substring of one column (trigram tokenizer)"""
+    escaped = text.replace('"', '""')
+    return f'{column}: "{escaped}"'
+
+
+def _select_photos(conn, schema, table, path_column, photo_type, where,
+                   client=None, date=None, camera=None, location=False):
+    """Build one branch of the unified search query (FTS5 for client/camera when indexed)"""
+    conditions = [where] if where else []
+    params = []
+
+    fts_table = f"{table}_fts"
+    has_fts = conn.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)
+    ).fetchone()
+
+    match_terms = []
+    for column, value in (('client_name', client), ('camera_model', camera)):
+        if not value:
+            continue
+        if has_fts and len(value) >= FTS_MIN_TERM:
+            match_terms.append(_fts_phrase(column, value))
+        else:
+            conditions.append(f"{column} LIKE ?")
+            params.append(f"%{value}%")
+    if match_terms:
+        conditions.append(f"rowid IN (SELECT rowid FROM {schema}.{fts_table} WHERE {fts_table} MATCH ?)")
+        params.append(" AND ".join(match_terms))
+
+    if date:
+        conditions.append("date = ?")
+        params.append(date)
+    if location:
+        conditions.append("gps_latitude IS NOT NULL AND gps_longitude IS NOT NULL")
+
+    query = f"SELECT {path_column}, client_name, date, camera_model, '{photo_type}' as type FROM {schema}.{table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    return query, params
+
+
+def _open_search_db():
+    """Open the JPG database with the RAW database attached (or whichever exists)
+
+    Returns (conn, sources), where each source is (schema, table, path column, type, base filter),
+    or None if neither database exists.
+    """
+    has_jpg = os.path.exists(JPG_DB)
+    has_raw = os.path.exists(RAW_DB)
+    if not has_jpg and not has_raw:
+        return None
+
+    sources = []
+    if has_jpg:
+        conn = _open_db(JPG_DB)
+        sources.append(('main', 'photos', 'filepath', 'JPG', None))
+        raw_schema = 'raw'
+        if has_raw:
+            try:
+                conn.execute("ATTACH DATABASE ? AS raw", (_readonly_uri(RAW_DB),))
+            except sqlite3.Error as e:
+                print(f"Warning: Could not search RAW database: {e}")
+                has_raw = False
+    else:
+        conn = _open_db(RAW_DB)
+        raw_schema = 'main'
+
+    # RAW database (with previews)
+    if has_raw:
+        # preview_path IS NOT NULL matches the partial idx_raw_date, so rows come back pre-sorted
+        sources.append((raw_schema, 'raw_photos', 'preview_path', 'RAW', 'preview_path IS NOT NULL'))
+
+    return conn, sources
+
+
+def _execute_search(db, wrapper, extra_params, client=None, date=None, camera=None, location=False):
+    """Run the unified JPG + RAW query on an open search db, substituted into wrapper as {union}"""
+    conn, sources = db
+    selects = [_select_photos(conn, *source, client=client, date=date, camera=camera, location=location)
+               for source in sources]
+
+    union = " UNION ALL ".join(select for select, _ in selects)
+    params = [param for _, select_params in selects for param in select_params]
+
+    return conn.execute(wrapper.format(union=union), params + list(extra_params))
+
+
+SEARCH_SQL = "{union} ORDER BY date DESC LIMIT ?"
+COUNT_SQL = "SELECT type, COUNT(*) FROM ({union}) GROUP BY type"
+
+
+def iter_all_photos(client=None, date=None, camera=None, location=False, limit=50, db=None):
+    """Yield photos from both databases, newest first, straight from the cursor"""
+    owned = db is None
+    try:
+        if owned:
+            db = _open_search_db()
+            if db is None:
+                return
+        yield from _execute_search(db, SEARCH_SQL, [limit],
+                                   client=client, date=date, camera=camera, location=location)
+    except Exception as e:
+        print(f"Warning: Could not search photo databases: {e}")
+    finally:
+        if owned and db is not None:
+            db[0].close()
+
+
+def search_all_photos(client=None, date=None, camera=None, location=False, limit=50, db=None):
     """Search both JPG and RAW databases"""
-    results = []
-
-    # Search JPG database
-    if os.path.exists(JPG_DB):
-        try:
-            conn = sqlite3.connect(JPG_DB, timeout=5.0)
-            cursor = conn.cursor()
-
-            query = "SELECT filepath, client_name, date, camera_model, 'JPG' as type FROM photos WHERE 1=1"
-            params = []
-
-            if client:
-                query += " AND client_name LIKE ?"
-                params.append(f"%{client}%")
-            if date:
-                query += " AND date = ?"
-                params.append(date)
-            if camera:
-                query += " AND camera_model LIKE ?"
-                params.append(f"%{camera}%")
-            if location:
-                query += " AND gps_latitude IS NOT NULL AND gps_longitude IS NOT NULL"
-
-            query += f" ORDER BY date DESC LIMIT {limit}"
-
-            cursor.execute(query, params)
-            results.extend(cursor.fetchall())
-            conn.close()
-        except Exception as e:
-            print(f"Warning: Could not search JPG database: {e}")
-
-    # Search RAW database (with previews)
-    if os.path.exists(RAW_DB):
-        try:
-            conn = sqlite3.connect(RAW_DB, timeout=5.0)
-            cursor = conn.cursor()
-
-            query = "SELECT preview_path, client_name, date, camera_model, 'RAW' as type FROM raw_photos WHERE preview_path IS NOT NULL AND 1=1"
-            params = []
-
-            if client:
-                query += " AND client_name LIKE ?"
-                params.append(f"%{client}%")
-            if date:
-                query += " AND date = ?"
-                params.append(date)
-            if camera:
-                query += " AND camera_model LIKE ?"
-                params.append(f"%{camera}%")
-            if location:
-                query += " AND gps_latitude IS NOT NULL AND gps_longitude IS NOT NULL"
-
-            query += f" ORDER BY date DESC LIMIT {limit}"
-
-            cursor.execute(query, params)
-            results.extend(cursor.fetchall())
-            conn.close()
-        except Exception as e:
-            print(f"Warning: Could not search RAW database: {e}")
-
-    return results
+    return list(iter_all_photos(client, date, camera, location, limit, db))
+
+
+def count_all_photos(client=None, date=None, camera=None, location=False, db=None):
+    """Count matching photos per type in SQL, without fetching any rows"""
+    counts = {'JPG': 0, 'RAW': 0}
+    owned = db is None
+    try:
+        if owned:
+            db = _open_search_db()
+            if db is None:
+                return counts
+        counts.update(_execute_search(db, COUNT_SQL, [],
+                                      client=client, date=date, camera=camera, location=location))
+    except Exception as e:
+        print(f"Warning: Could not search photo databases: {e}")
+    finally:
+        if owned and db is not None:
+            db[0].close()
+
+    return counts
+
+
+def _handle_request(db, request):
+    """Answer one client request against the server's open search db
+
+    Runs the queries directly so errors reach the client as {'error': ...} instead of
+    being printed server-side and answered with an empty result.
+    """
+    filters = {key: request.get(key) for key in ('client', 'date', 'camera', 'location')}
+    if request.get('op') == 'ping':
+        return {'ok': True}
+    if request.get('op') == 'count':
+        counts = {'JPG': 0, 'RAW': 0}
+        counts.update(_execute_search(db, COUNT_SQL, [], **filters))
+        return {'counts': counts}
+    return {'rows': list(_execute_search(db, SEARCH_SQL, [request.get('limit', 50)], **filters))}
+
+
+def serve(address=SERVER_ADDRESS):
+    """Serve searches to thin clients, keeping the database connection and statement cache warm"""
+    if query_server({'op': 'ping'}, address) is not None:
+        print(f"Photo search server already running on {address}")
+        return
+
+    db = _open_search_db()
+    if db is None:
+        print("No photo databases found")
+        return
+
+    # Remove a stale socket left behind by a server that did not shut down cleanly
+    if os.name != 'nt' and os.path.exists(address):
+        os.unlink(address)
+
+    print(f"Serving photo search on {address} (Ctrl+C to stop)")
+    try:
+        with Listener(address) as listener:
+            while True:
+                try:
+                    with listener.accept() as client:
+                        try:
+                            reply = _handle_request(db, json.loads(client.recv_bytes()))
+                        except Exception as e:
+                            reply = {'error': str(e)}
+                        client.send_bytes(json.dumps(reply).encode())
+                except (OSError, EOFError):
+                    continue  # Client went away mid-request
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db[0].close()
+
+
+def query_server(request, address=SERVER_ADDRESS):
+    """Send a request to a running --serve instance, returns its reply or None if unavailable"""
+    try:
+        with Client(address) as conn:
+            conn.send_bytes(json.dumps(request).encode())
+            reply = json.loads(conn.recv_bytes())
+    except (OSError, EOFError):
+        return None
+
+    if 'error' in reply:
+        print(f"Warning: Photo search server failed, searching locally: {reply['error']}")
+        return None
+    return reply
 
 
 def main():
@@ -86,35 +257,40 @@ def main():
     parser.add_argument('--limit', type=int, default=50, help='Max results (default: 50)')
     parser.add_argument('--count', action='store_true', help='Just count results')
     parser.add_argument('--simple', action='store_true', help='Simple output (paths only)')
+    parser.add_argument('--serve', action='store_true', help='Run as a search server for faster repeated queries')
 
     args = parser.parse_args()
 
+    if args.serve:
+        serve()
+        return
+
     # Handle quick search (positional argument)
     if args.query:
         args.client = args.query
 
-    # Search
-    results = search_all_photos(
-        client=args.client,
-        date=args.date,
-        camera=args.camera,
-        location=args.location,
-        limit=args.limit
-    )
+    filters = dict(client=args.client, date=args.date, camera=args.camera, location=args.location)
 
+    # Use a running --serve instance if there is one, otherwise search directly
     if args.count:
-        print(f"Total photos found: {len(results)}")
-        jpg_count = sum(1 for r in results if r[4] == 'JPG')
-        raw_count = sum(1 for r in results if r[4] == 'RAW')
-        print(f"  JPG: {jpg_count}")
-        print(f"  RAW previews: {raw_count}")
+        reply = query_server({'op': 'count', **filters})
+        counts = reply['counts'] if reply else count_all_photos(**filters)
+        print(f"Total photos found: {counts['JPG'] + counts['RAW']}")
+        print(f"  JPG: {counts['JPG']}")
+        print(f"  RAW previews: {counts['RAW']}")
         return
 
+    reply = query_server({'op': 'search', **filters, 'limit': args.limit})
+
     if args.simple:
-        for filepath, _, _, _, _ in results:
+        rows = reply['rows'] if reply else iter_all_photos(**filters, limit=args.limit)
+        for filepath, _, _, _, _ in rows:
             print(filepath)
         return
 
+    # Search
+    results = reply['rows'] if reply else search_all_photos(**filters, limit=args.limit)
+
     # Detailed output
     print(f"\nFound {len(results)} photos:\n")
     for filepath, client, date, camera, photo_type in results:
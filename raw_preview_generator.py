@@ -4,6 +4,7 @@ RAW Preview Generator for OpenClaw
 Scans RAW files, generates small JPG previews for WhatsApp sharing
 """
 
+import io
 import os
 import sys
 import argparse
@@ -12,6 +13,12 @@ from pathlib import Path
 from datetime import datetime
 import re
 import time
+import queue
+import signal
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
 
 try:
     import rawpy
@@ -23,6 +30,8 @@ except ImportError:
     import rawpy
     import imageio
 
+import numpy as np  # Installed with rawpy
+
 try:
     from PIL import Image, ExifTags
 except ImportError:
@@ -36,9 +45,53 @@ DB_PATH = r"x:\openclaw\workspace\raw_photos.db"  # Separate database for RAW fi
 PREVIEW_DIR = r"x:\openclaw\workspace\previews"
 PREVIEW_SIZE = 1080  # Long edge in pixels
 PREVIEW_QUALITY = 85  # JPG quality (1-100)
+DB_BATCH_SIZE = 100  # Rows written per transaction
+DB_QUEUE_SIZE = 500  # Rows buffered for the writer process before the scan blocks
+BULK_ANALYZE_ROWS = 1000  # Rows written in one scan that trigger a full ANALYZE
+MAX_WORKERS = min(os.cpu_count() or 1, 8)  # Parallel RAW decoders (each holds a decoded RAW in memory)
 
 # Supported RAW formats
-RAW_EXTENSIONS = {'.arw', '.cr2', '.nef', '.dng', '.raf', '.orf', '.rw2', '.pef', '.srw', '.cr3'}
+RAW_EXTENSIONS = frozenset({'.arw', '.cr2', '.nef', '.dng', '.raf', '.orf', '.rw2', '.pef', '.srw', '.cr3'})
+
+# Preview directories already ensured by this process
+_created_dirs = set()
+
+# Client folder patterns (compiled once - parse_client_info runs per file)
+_DATE_CLIENT_RE = re.compile(r'(\d{4}-\d{2}-\d{2})\s+([^\\\/]+)')  # YYYY-MM-DD ClientName
+_DATE_ONLY_RE = re.compile(r'(\d{4}-\d{2}-\d{2})[\\/]')  # YYYY-MM-DD (date only)
+
+# Rotation to apply to previews, keyed by LibRaw's sizes.flip
+# (embedded previews are stored unrotated and postprocess() runs with user_flip=0)
+FLIP_ROTATION = {
+    3: Image.Transpose.ROTATE_180,
+    5: Image.Transpose.ROTATE_90,
+    6: Image.Transpose.ROTATE_270,
+}
+
+# Applied to every connection (journal_mode is persistent, so only writers set it)
+DB_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;
+    PRAGMA busy_timeout=30000;
+"""
+
+
+def _readonly_uri(path):
+    """SQLite URI opening path read-only with a shared page cache"""
+    # absolute(), not resolve(): resolve() turns mapped drives like X: into UNC paths
+    return Path(path).absolute().as_uri() + '?mode=ro&cache=shared'
+
+
+def _open_db(path, readonly=False):
+    """Open SQLite connection with WAL and tuned PRAGMAs (read-only connections share the page cache)"""
+    if readonly:
+        conn = sqlite3.connect(_readonly_uri(path), timeout=30.0, isolation_level=None, uri=True)
+        conn.executescript(DB_PRAGMAS)
+    else:
+        conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        conn.executescript('PRAGMA journal_mode=WAL;' + DB_PRAGMAS)
+    return conn
 
 
 def db_execute_with_retry(cursor, query, params=(), max_retries=5, delay=0.5):
@@ -56,19 +109,76 @@ def db_execute_with_retry(cursor, query, params=(), max_retries=5, delay=0.5):
     return False
 
 
+# Trigram FTS5 index over raw_photos (substring search), kept in sync by triggers
+RAW_FTS_SCHEMA = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS raw_photos_fts USING fts5(
+        client_name, camera_model,
+        tokenize='trigram', content='raw_photos', content_rowid='id'
+    );
+    CREATE TRIGGER IF NOT EXISTS raw_photos_fts_ai AFTER INSERT ON raw_photos BEGIN
+        INSERT INTO raw_photos_fts(rowid, client_name, camera_model)
+        VALUES (new.id, new.client_name, new.camera_model);
+    END;
+    CREATE TRIGGER IF NOT EXISTS raw_photos_fts_ad AFTER DELETE ON raw_photos BEGIN
+        INSERT INTO raw_photos_fts(raw_photos_fts, rowid, client_name, camera_model)
+        VALUES ('delete', old.id, old.client_name, old.camera_model);
+    END;
+    CREATE TRIGGER IF NOT EXISTS raw_photos_fts_au AFTER UPDATE ON raw_photos BEGIN
+        INSERT INTO raw_photos_fts(raw_photos_fts, rowid, client_name, camera_model)
+        VALUES ('delete', old.id, old.client_name, old.camera_model);
+        INSERT INTO raw_photos_fts(rowid, client_name, camera_model)
+        VALUES (new.id, new.client_name, new.camera_model);
+    END;
+'''
+FTS_MIN_TERM = 3  # Trigram MATCH needs at least 3 characters; shorter terms use LIKE
+
+INSERT_RAW_PHOTO_SQL = '''
+    INSERT OR REPLACE INTO raw_photos (
+        filepath, preview_path, client_name, date,
+        camera_make, camera_model, lens_model,
+        iso, aperture, shutter_speed, focal_length,
+        datetime, gps_latitude, gps_longitude,
+        size_mb, preview_size_kb, indexed_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def db_write_batch(conn, rows):
+    """Write a batch of raw_photos rows in a single BEGIN IMMEDIATE transaction, returns rows written"""
+    cursor = conn.cursor()
+    # Taking the write lock up front is the only contention point
+    db_execute_with_retry(cursor, 'BEGIN IMMEDIATE')
+    try:
+        cursor.executemany(INSERT_RAW_PHOTO_SQL, rows)
+        conn.commit()
+        return len(rows)
+    except Exception:
+        conn.rollback()
+
+    # Retry row by row so one bad row only loses itself
+    written = 0
+    db_execute_with_retry(cursor, 'BEGIN IMMEDIATE')
+    for row in rows:
+        try:
+            cursor.execute(INSERT_RAW_PHOTO_SQL, row)
+            written += 1
+        except Exception as e:
+            print(f"\n  Database error for {row[0]}: {e}")
+    conn.commit()
+    return written
+
+
 def parse_client_info(filepath):
     """Extract client name and date from filepath"""
     # Pattern 1: YYYY-MM-DD ClientName (with client name)
-    pattern1 = r'(\d{4}-\d{2}-\d{2})\s+([^\\\/]+)'
-    match = re.search(pattern1, filepath)
+    match = _DATE_CLIENT_RE.search(filepath)
     if match:
         date_str = match.group(1)
         client_name = match.group(2).strip()
         return client_name, date_str
 
     # Pattern 2: YYYY-MM-DD (date only, no client name)
-    pattern2 = r'(\d{4}-\d{2}-\d{2})[\\/]'
-    match = re.search(pattern2, filepath)
+    match = _DATE_ONLY_RE.search(filepath)
     if match:
         date_str = match.group(1)
         return None, date_str
@@ -84,40 +194,74 @@ def get_preview_path(raw_path, preview_dir=None):
     return str(preview_file)
 
 
-def convert_raw_to_preview(raw_path, preview_path, max_size=1080, quality=85):
-    """Convert RAW file to small JPG preview"""
+def open_embedded_preview(raw, max_size=1080):
+    """Open the JPEG/bitmap preview embedded in a RAW file, or None if missing or too small"""
     try:
-        # Read RAW file
-        with rawpy.imread(raw_path) as raw:
-            # Extract embedded preview or process RAW
-            # Using postprocess for better quality
-            rgb = raw.postprocess(
-                use_camera_wb=True,
-                half_size=True,  # Faster processing
-                no_auto_bright=False,
-                output_bps=8
-            )
+        thumb = raw.extract_thumb()
+    except (rawpy.LibRawNoThumbnailError, rawpy.LibRawUnsupportedThumbnailError):
+        return None
 
-        # Convert to PIL Image
-        img = Image.fromarray(rgb)
+    if thumb.format == rawpy.ThumbFormat.JPEG:
+        # Only the header is parsed here; pixels are decoded on first use
+        img = Image.open(io.BytesIO(thumb.data))
+    else:
+        img = Image.fromarray(thumb.data)
 
-        # Resize to target size (preserve aspect ratio)
-        img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    # Some formats only embed a tiny thumbnail - demosaic those instead
+    if max(img.size) < max_size:
+        return None
 
-        # Create preview directory if needed
-        os.makedirs(os.path.dirname(preview_path), exist_ok=True)
+    # Let libjpeg decode at 1/2, 1/4 or 1/8 scale, keeping the long edge >= 2x target size.
+    # Pillow scales by the tighter of the two axes, so the box must follow the aspect ratio
+    scale = 2 * max_size / max(img.size)
+    img.draft('RGB', (int(img.size[0] * scale), int(img.size[1] * scale)))
 
-        # Save as JPG with optimization
-        img.save(preview_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return img
 
-        return True, os.path.getsize(preview_path)
 
-    except Exception as e:
-        return False, str(e)
+def convert_raw_to_preview(raw, preview_path, max_size=1080, quality=85):
+    """Convert an open RAW file to small JPG preview, returns preview size in bytes"""
+    # Read orientation first - postprocess(user_flip=0) overwrites sizes.flip
+    rotation = FLIP_ROTATION.get(raw.sizes.flip)
+
+    # Use embedded preview if available (skips the demosaic entirely)
+    img = open_embedded_preview(raw, max_size)
+
+    if img is None:
+        # No usable embedded preview - process RAW
+        rgb = raw.postprocess(
+            use_camera_wb=True,
+            half_size=True,  # Faster processing
+            no_auto_bright=True,  # Skip the full-image histogram pass
+            user_flip=0,  # Rotate the small preview below instead
+            output_bps=8
+        )
+        # No-op for contiguous output; avoids an extra full-size copy in fromarray() otherwise
+        img = Image.fromarray(np.ascontiguousarray(rgb))
+
+    # Resize to target size (preserve aspect ratio)
+    # Box-filter pre-reduce + bilinear is indistinguishable from LANCZOS at this size
+    img.thumbnail((max_size, max_size), Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+    # Rotate after resizing (cheaper on the small image)
+    if rotation is not None:
+        img = img.transpose(rotation)
+
+    # Create preview directory if needed (once per directory per process)
+    preview_dir = os.path.dirname(preview_path)
+    if preview_dir not in _created_dirs:
+        os.makedirs(preview_dir, exist_ok=True)
+        _created_dirs.add(preview_dir)
 
+    # Save as baseline JPG with 4:2:0 chroma subsampling (single encode pass;
+    # optimize/progressive double the encode time for a few % size at this quality)
+    img.save(preview_path, 'JPEG', quality=quality, subsampling=2)
 
-def extract_exif_from_raw(raw_path):
-    """Extract EXIF metadata from RAW file using ExifTool (preferred) or rawpy (fallback)"""
+    return os.path.getsize(preview_path)
+
+
+def extract_exif_from_raw(raw_path, raw):
+    """Extract EXIF metadata from RAW file using ExifTool (preferred) or the open rawpy handle (fallback)"""
     import subprocess
     import json
     import shutil
@@ -202,41 +346,145 @@ def extract_exif_from_raw(raw_path):
             print(f"Warning: ExifTool failed, trying rawpy fallback: {e}")
 
     # Fallback to rawpy if ExifTool not available or failed
+    try:
+        # Get metadata from RAW
+        if hasattr(raw, 'metadata'):
+            # Camera info
+            metadata['camera_make'] = getattr(raw.metadata, 'make', None)
+            metadata['camera_model'] = getattr(raw.metadata, 'model', None)
+
+            # Exposure settings
+            metadata['iso'] = getattr(raw.metadata, 'iso_speed', None)
+
+            # Aperture
+            if hasattr(raw.metadata, 'aperture'):
+                metadata['aperture'] = f"f/{raw.metadata.aperture:.1f}"
+
+            # Shutter speed
+            if hasattr(raw.metadata, 'shutter'):
+                ss = raw.metadata.shutter
+                if ss >= 1:
+                    metadata['shutter_speed'] = f"{ss:.1f}s"
+                else:
+                    metadata['shutter_speed'] = f"1/{int(1/ss)}"
+
+            # Focal length
+            if hasattr(raw.metadata, 'focal_length'):
+                metadata['focal_length'] = f"{raw.metadata.focal_length:.0f}mm"
+
+            # Timestamp
+            if hasattr(raw.metadata, 'timestamp'):
+                metadata['datetime'] = datetime.fromtimestamp(raw.metadata.timestamp)
+
+    except Exception as e:
+        pass  # Silently fail - already warned above
+
+    return metadata
+
+
+def _process_raw(raw_path, preview_path, max_size=1080, quality=85, extract_metadata=True):
+    """Generate preview and extract metadata from a single open of the RAW file"""
     try:
         with rawpy.imread(raw_path) as raw:
-            # Get metadata from RAW
-            if hasattr(raw, 'metadata'):
-                # Camera info
-                metadata['camera_make'] = getattr(raw.metadata, 'make', None)
-                metadata['camera_model'] = getattr(raw.metadata, 'model', None)
+            preview_size = convert_raw_to_preview(raw, preview_path, max_size, quality)
+            metadata = extract_exif_from_raw(raw_path, raw) if extract_metadata else None
+        return True, preview_size, metadata
 
-                # Exposure settings
-                metadata['iso'] = getattr(raw.metadata, 'iso_speed', None)
+    except Exception as e:
+        return False, str(e), None
 
-                # Aperture
-                if hasattr(raw.metadata, 'aperture'):
-                    metadata['aperture'] = f"f/{raw.metadata.aperture:.1f}"
 
-                # Shutter speed
-                if hasattr(raw.metadata, 'shutter'):
-                    ss = raw.metadata.shutter
-                    if ss >= 1:
-                        metadata['shutter_speed'] = f"{ss:.1f}s"
-                    else:
-                        metadata['shutter_speed'] = f"1/{int(1/ss)}"
+def _process_one(raw_path, extract_metadata=True):
+    """Worker: generate preview and extract metadata for a single RAW file"""
+    preview_path = get_preview_path(raw_path, PREVIEW_DIR)
+    success, result, metadata = _process_raw(raw_path, preview_path, PREVIEW_SIZE, PREVIEW_QUALITY, extract_metadata)
+    return raw_path, preview_path, success, result, metadata
 
-                # Focal length
-                if hasattr(raw.metadata, 'focal_length'):
-                    metadata['focal_length'] = f"{raw.metadata.focal_length:.0f}mm"
 
-                # Timestamp
-                if hasattr(raw.metadata, 'timestamp'):
-                    metadata['datetime'] = datetime.fromtimestamp(raw.metadata.timestamp)
+def _flush_batch(conn, batch):
+    """Write a batch from the writer process, reporting instead of raising on failure"""
+    if conn is None:
+        return 0
+    try:
+        return db_write_batch(conn, batch)
+    except Exception as e:
+        if conn.in_transaction:
+            conn.rollback()
+        print(f"\n  Database error writing {len(batch)} rows: {e}")
+        return 0
+
+
+def _db_writer(db_path, row_queue):
+    """Writer process: owns the only write connection, batches queued rows into transactions
+
+    Always drains the queue up to the None sentinel so the scan never blocks on a full queue;
+    exits with code 1 if any row could not be written.
+    """
+    # Ctrl+C is handled by the scan, which still sends the sentinel so queued rows get written
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
 
+    conn = None
+    try:
+        conn = _open_db(db_path)
+        # INSERT OR REPLACE only fires the FTS delete trigger with recursive triggers on
+        conn.execute('PRAGMA recursive_triggers=ON')
     except Exception as e:
-        pass  # Silently fail - already warned above
+        print(f"\n  Database error opening {db_path}: {e}")
+
+    batch = []
+    queued = 0
+    written = 0
+    while (row := row_queue.get()) is not None:
+        batch.append(row)
+        queued += 1
+        if len(batch) >= DB_BATCH_SIZE:
+            written += _flush_batch(conn, batch)
+            batch.clear()
+
+    if batch:
+        written += _flush_batch(conn, batch)
+
+    if conn is not None:
+        try:
+            # Full statistics after a bulk ingest, otherwise let SQLite re-analyze only where needed
+            if written > BULK_ANALYZE_ROWS:
+                conn.execute('ANALYZE raw_photos')
+            conn.execute('PRAGMA optimize')
+        except sqlite3.Error as e:
+            print(f"\n  Database error updating statistics: {e}")
+        conn.close()
 
-    return metadata
+    if written < queued:
+        print(f"\n  Database: {queued - written} of {queued} rows were not saved")
+        sys.exit(1)
+
+
+def _queue_row(writer, writer_q, row):
+    """Queue a row for the writer without blocking forever, returns False if the writer died"""
+    while writer.is_alive():
+        try:
+            writer_q.put(row, timeout=1.0)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _iter_raw(directory):
+    """Yield RAW file paths under directory (iterative os.scandir walk, no per-file stat/Path)"""
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    name = entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif name[name.rfind('.'):].lower() in RAW_EXTENSIONS and entry.is_file(follow_symlinks=False):
+                        yield entry.path
+        except OSError:
+            continue  # Unreadable directory - skip like os.walk does
 
 
 def scan_raw_files(directory, update_db=True, regenerate=False, limit=None):
@@ -244,28 +492,10 @@ def scan_raw_files(directory, update_db=True, regenerate=False, limit=None):
     print(f"\nScanning: {directory}")
     print("Looking for RAW files...")
 
-    raw_files = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if Path(file).suffix.lower() in RAW_EXTENSIONS:
-                raw_files.append(os.path.join(root, file))
-                if limit and len(raw_files) >= limit:
-                    break
-        if limit and len(raw_files) >= limit:
-            break
-
-    print(f"Found {len(raw_files)} RAW files")
-
-    if not raw_files:
-        print("No RAW files found!")
-        return
-
     # Connect to database
     conn = None
     if update_db:
-        conn = sqlite3.connect(DB_PATH, timeout=30.0)
-        # Enable WAL mode for better concurrent access
-        conn.execute('PRAGMA journal_mode=WAL')
+        conn = _open_db(DB_PATH)
         cursor = conn.cursor()
 
         # Create raw_photos table if it doesn't exist
@@ -291,70 +521,111 @@ def scan_raw_files(directory, update_db=True, regenerate=False, limit=None):
                 indexed_at TEXT
             )
         ''')
-        conn.commit()
+
+        # Partial covering index: search streams previews in date order and stops at LIMIT
+        db_execute_with_retry(cursor, '''
+            CREATE INDEX IF NOT EXISTS idx_raw_date
+            ON raw_photos(date DESC, client_name, camera_model, preview_path)
+            WHERE preview_path IS NOT NULL
+        ''')
+        db_execute_with_retry(cursor, 'CREATE INDEX IF NOT EXISTS idx_raw_camera ON raw_photos(camera_model)')
+
+        # Create full-text index for client/camera search (populate it once if new)
+        fts_exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'raw_photos_fts'"
+        ).fetchone()
+        try:
+            conn.executescript(RAW_FTS_SCHEMA)
+            if not fts_exists:
+                conn.execute("INSERT INTO raw_photos_fts(raw_photos_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError as e:
+            print(f"Warning: Full-text index unavailable, search will use LIKE: {e}")
+
+    # Load already-indexed files once so re-scans skip them without touching the RAW
+    known = set()
+    if update_db and not regenerate:
+        known = {row[0] for row in cursor.execute('SELECT filepath FROM raw_photos')}
+
+    # Hand all writes to a dedicated writer process (single write connection)
+    writer_q = writer = None
+    if update_db:
+        conn.close()
+        writer_q = mp.Queue(maxsize=DB_QUEUE_SIZE)
+        writer = mp.Process(target=_db_writer, args=(DB_PATH, writer_q))
+        writer.start()
+    writer_alive = writer is not None
 
     # Process each RAW file
+    found = 0
     processed = 0
     skipped = 0
     failed = 0
 
-    for idx, raw_path in enumerate(raw_files, 1):
-        print(f"\r  Processing {idx}/{len(raw_files)}...", end='', flush=True)
+    def pending_raw_files():
+        """Stream discovered RAW files into the pool, skipping indexed files unless regenerating"""
+        nonlocal found, skipped
+        raw_files = _iter_raw(directory)
+        if limit:
+            raw_files = islice(raw_files, limit)
+        for raw_path in raw_files:
+            found += 1
+            # Skip only when the preview is still on disk and there is no row to add
+            # (already indexed, or not updating the DB); deleted previews get rebuilt
+            if (not regenerate and (raw_path in known or not update_db)
+                    and os.path.exists(get_preview_path(raw_path, PREVIEW_DIR))):
+                skipped += 1
+                continue
+            yield raw_path
 
-        # Generate preview path
-        preview_path = get_preview_path(raw_path, PREVIEW_DIR)
+    # Convert RAW to preview in parallel (demosaic + resize + encode are CPU-bound)
+    worker = partial(_process_one, extract_metadata=update_db)
+    try:
+        with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = executor.map(worker, pending_raw_files(), chunksize=4)
+            for idx, (raw_path, preview_path, success, result, metadata) in enumerate(results, 1):
+                print(f"\r  Processing {skipped + idx}/{found}...", end='', flush=True)
 
-        # Skip if preview exists and regenerate=False
-        if not regenerate and os.path.exists(preview_path):
-            skipped += 1
-            continue
+                if not success:
+                    print(f"\n  Failed: {raw_path}: {result}")
+                    failed += 1
+                    continue
 
-        # Convert RAW to preview
-        success, result = convert_raw_to_preview(raw_path, preview_path, PREVIEW_SIZE, PREVIEW_QUALITY)
+                preview_size_kb = result / 1024
+                processed += 1
 
-        if not success:
-            print(f"\n  Failed: {raw_path}: {result}")
-            failed += 1
-            continue
+                # Queue database row if updating database
+                if not update_db:
+                    continue
+
+                client_name, date = parse_client_info(raw_path)
+                raw_size_mb = os.path.getsize(raw_path) / (1024 * 1024)
 
-        preview_size_kb = result / 1024
-        processed += 1
-
-        # Extract metadata if updating database
-        if update_db:
-            client_name, date = parse_client_info(raw_path)
-            metadata = extract_exif_from_raw(raw_path)
-            raw_size_mb = os.path.getsize(raw_path) / (1024 * 1024)
-
-            # Insert/update database
-            try:
-                db_execute_with_retry(cursor, '''
-                    INSERT OR REPLACE INTO raw_photos (
-                        filepath, preview_path, client_name, date,
-                        camera_make, camera_model, lens_model,
-                        iso, aperture, shutter_speed, focal_length,
-                        datetime, gps_latitude, gps_longitude,
-                        size_mb, preview_size_kb, indexed_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                row = (
                     raw_path, preview_path, client_name, date,
                     metadata['camera_make'], metadata['camera_model'], metadata['lens_model'],
                     metadata['iso'], metadata['aperture'], metadata['shutter_speed'], metadata['focal_length'],
                     metadata['datetime'], metadata['gps_latitude'], metadata['gps_longitude'],
                     raw_size_mb, preview_size_kb, datetime.now().isoformat()
-                ))
-            except Exception as e:
-                print(f"\n  Database error for {raw_path}: {e}")
-
-        # Commit every 50 files
-        if update_db and processed % 50 == 0:
-            conn.commit()
+                )
+                if writer_alive and not _queue_row(writer, writer_q, row):
+                    print("\n  Database writer stopped - remaining files will not be indexed")
+                    writer_alive = False
+    finally:
+        if writer:
+            if writer_alive:
+                _queue_row(writer, writer_q, None)  # Flush remaining rows and close
+            writer.join()
+            if writer.exitcode:
+                # Don't wait at exit to feed rows a dead writer will never read
+                writer_q.cancel_join_thread()
+                print(f"\n  Warning: database writer exited with code {writer.exitcode} - "
+                      "some files were not indexed")
+
+    if not found:
+        print("No RAW files found!")
+        return
 
-    print(f"\r  Processed {len(raw_files)} RAW files")
-
-    if update_db:
-        conn.commit()
-        conn.close()
+    print(f"\r  Processed {found} RAW files")
 
     print(f"\nResults:")
     print(f"  Generated: {processed} previews")
@@ -363,23 +634,38 @@ def scan_raw_files(directory, update_db=True, regenerate=False, limit=None):
     print(f"\nPreviews stored in: {PREVIEW_DIR}")
 
 
+def _fts_phrase(column, text):
+    """FTS5 MATCH expression for a substring of one column (trigram tokenizer)"""
+    escaped = text.replace('"', '""')
+    return f'{column}: "{escaped}"'
+
+
 def search_raw_photos(client=None, date=None, limit=50):
     """Search RAW photos database"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = _open_db(DB_PATH, readonly=True)
     cursor = conn.cursor()
 
-    query = "SELECT filepath, preview_path, client_name, date, camera_model FROM raw_photos WHERE 1=1"
+    # Every indexed row has a preview; the predicate lets idx_raw_date serve the ORDER BY ... LIMIT
+    query = "SELECT filepath, preview_path, client_name, date, camera_model FROM raw_photos WHERE preview_path IS NOT NULL"
     params = []
 
     if client:
-        query += " AND client_name LIKE ?"
-        params.append(f"%{client}%")
+        has_fts = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'raw_photos_fts'"
+        ).fetchone()
+        if has_fts and len(client) >= FTS_MIN_TERM:
+            query += " AND id IN (SELECT rowid FROM raw_photos_fts WHERE raw_photos_fts MATCH ?)"
+            params.append(_fts_phrase('client_name', client))
+        else:
+            query += " AND client_name LIKE ?"
+            params.append(f"%{client}%")
 
     if date:
         query += " AND date = ?"
         params.append(date)
 
-    query += f" ORDER BY date DESC LIMIT {limit}"
+    query += " ORDER BY date DESC LIMIT ?"
+    params.append(limit)
 
     cursor.execute(query, params)
     results = cursor.fetchall()